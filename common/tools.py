@@ -70,6 +70,20 @@ def compute_locator(tx_id):
     return tx_id[:LOCATOR_LEN_HEX]
 
 
+def compute_locator_txid_map(tx_ids):
+    """
+    Computes the ``locator:txid`` map of a given list of transaction ids.
+
+    Args:
+        tx_ids (:obj:`list`): the transaction ids used to compute the locators.
+
+    Returns:
+       :obj:`dict`: A dictionary of ``locator:txid`` pairs.
+    """
+
+    return {compute_locator(tx_id): tx_id for tx_id in tx_ids}
+
+
 def setup_data_folder(data_folder):
     """
     Create a data folder for either the client or the server side if the folder does not exists.
@@ -421,6 +421,6 @@ def test_save_appointment_receipt(monkeypatch):
 
     # Check that the receipt has been saved by checking the file names
     files = os.listdir(appointments_folder)
-    assert any([dummy_appointment.locator in f for f in files])
+    assert any(dummy_appointment.locator in f for f in files)
 
     shutil.rmtree(appointments_folder)
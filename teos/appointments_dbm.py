@@ -202,6 +202,37 @@ class AppointmentsDBM(DBManager):
             self.logger.info("Couldn't add appointment to db.", uuid=uuid, appointment=appointment)
             return False
 
+    def batch_store_watcher_appointments(self, appointments):
+        """
+        Stores multiple appointments in the database using the ``WATCHER_PREFIX`` prefix.
+
+        Args:
+            appointments (:obj:`dict`): a dictionary of appointments (``uuid:appointment``), each of them encoded as a
+                dictionary.
+
+        Returns:
+            :obj:`bool`: True if all the appointments were stored in the db. False otherwise (none of them is stored).
+        """
+
+        # Everything is serialized before touching the db so a single bad appointment does not leave the batch
+        # half-written
+        try:
+            entries = [
+                ((WATCHER_PREFIX + uuid).encode("utf-8"), json.dumps(appointment).encode("utf-8"))
+                for uuid, appointment in appointments.items()
+            ]
+
+        except TypeError:
+            self.logger.info("Couldn't add appointments to db.", uuids=list(appointments.keys()))
+            return False
+
+        with self.db.write_batch(transaction=True) as b:
+            for key, value in entries:
+                b.put(key, value)
+
+        self.logger.info("Adding appointments to Watchers's db", uuids=list(appointments.keys()))
+        return True
+
     def store_responder_tracker(self, uuid, tracker):
         """
         Stores a tracker in the database using the ``RESPONDER_PREFIX`` prefix.
@@ -279,6 +310,37 @@ class AppointmentsDBM(DBManager):
         key = (LOCATOR_MAP_PREFIX + locator).encode("utf-8")
         self.db.put(key, json.dumps(locator_map).encode("utf-8"))
 
+    def batch_create_append_locator_maps(self, locator_uuid_map):
+        """
+        Creates (or appends to) multiple ``locator:uuid`` maps.
+
+        Existing maps are extended with the uuids that are not already there, the same way ``create_append_locator_map``
+        does.
+
+        Args:
+            locator_uuid_map (:obj:`dict`): a dictionary of ``locator:uuids`` where ``uuids`` is a list of 16-byte
+                hex-encoded unique ids to create (or add to) the map of each locator.
+        """
+
+        with self.db.write_batch(transaction=True) as b:
+            for locator, uuids in locator_uuid_map.items():
+                locator_map = self.load_locator_map(locator)
+
+                if locator_map is not None:
+                    for uuid in uuids:
+                        if uuid not in locator_map:
+                            locator_map.append(uuid)
+                            self.logger.info("Updating locator map", locator=locator, uuid=uuid)
+
+                        else:
+                            self.logger.info("UUID already in the map", locator=locator, uuid=uuid)
+
+                else:
+                    locator_map = list(dict.fromkeys(uuids))
+                    self.logger.info("Creating new locator map", locator=locator, uuids=uuids)
+
+                b.put((LOCATOR_MAP_PREFIX + locator).encode("utf-8"), json.dumps(locator_map).encode("utf-8"))
+
     def update_locator_map(self, locator, locator_map):
         """
         Updates a ``locator:uuid`` map in the database by deleting one of it's uuid. It will only work as long as
@@ -1,18 +1,18 @@
 from queue import Queue
-from threading import Thread
+from threading import Thread, Event
 from collections import OrderedDict
 from readerwriterlock import rwlock
 
 from teos.logger import get_logger
 import common.receipts as receipts
 from common.appointment import AppointmentStatus
-from common.tools import compute_locator
+from common.tools import compute_locator_txid_map
 from common.exceptions import BasicException, EncryptionError, InvalidParameter, SignatureError
 from common.cryptographer import Cryptographer, hash_160
 
 from teos.cleaner import Cleaner
 from teos.chain_monitor import ChainMonitor
-from teos.gatekeeper import SubscriptionExpired
+from teos.gatekeeper import AuthenticationFailure, NotEnoughSlots, SubscriptionExpired
 from teos.extended_appointment import ExtendedAppointment
 from teos.block_processor import InvalidTransactionFormat
 
@@ -79,7 +79,7 @@ class LocatorCache:
             if not target_block:
                 break
 
-            locator_txid_map = {compute_locator(txid): txid for txid in target_block.get("tx")}
+            locator_txid_map = compute_locator_txid_map(target_block.get("tx"))
             self.cache.update(locator_txid_map)
             self.blocks[target_block_hash] = list(locator_txid_map.keys())
             target_block_hash = target_block.get("previousblockhash")
@@ -153,7 +153,7 @@ class LocatorCache:
             if target_block:
                 # Compute the locator:txid pair for every transaction in the block and update both the cache and
                 # the block mapping.
-                locator_txid_map = {compute_locator(txid): txid for txid in target_block.get("tx")}
+                locator_txid_map = compute_locator_txid_map(target_block.get("tx"))
                 tmp_cache.cache.update(locator_txid_map)
                 tmp_cache.blocks[target_block_hash] = list(locator_txid_map.keys())
                 target_block_hash = target_block.get("previousblockhash")
@@ -209,6 +209,8 @@ class Watcher:
             time.
         last_known_block (:obj:`str`): The last block known by the :obj:`Watcher`.
         locator_cache (:obj:`LocatorCache`): A cache of locators for the last ``blocks_in_cache`` blocks.
+        block_processed (:obj:`Event <threading.Event>`): An event that is set every time the :obj:`Watcher` is done
+            processing a block, so other threads can wait for it instead of polling.
 
     Raises:
         :obj:`InvalidKey`: if teos sk cannot be loaded.
@@ -228,6 +230,7 @@ class Watcher:
         self.signing_key = sk
         self.last_known_block = db_manager.load_last_block_hash_watcher()
         self.locator_cache = LocatorCache(blocks_in_cache)
+        self.block_processed = Event()
 
     @property
     def tower_id(self):
@@ -348,6 +351,66 @@ class Watcher:
             :obj:`SubscriptionExpired`: If the user subscription has expired.
         """
 
+        return self._add_appointment(appointment, user_signature)
+
+    def batch_add_appointments(self, appointments):
+        """
+        Adds multiple appointments to the :obj:`Watcher`, in order.
+
+        This behaves like calling ``add_appointment`` for every appointment, but the start block is only queried once,
+        when the batch starts. If the :obj:`Watcher` processes a new block while the batch is being added, the
+        remaining appointments still get the height the batch started at (like a single appointment received just
+        before the block would).
+
+        Processing stops at the first rejected appointment. The appointments before it are kept, and their responses
+        are returned alongside the error so the accepted receipts are not lost.
+
+        Args:
+            appointments (:obj:`list`): a list of ``(appointment, user_signature)`` tuples, where ``appointment`` is an
+                :obj:`Appointment <common.appointment.Appointment>` and ``user_signature`` is the user's appointment
+                signature (hex-encoded).
+
+        Returns:
+            :obj:`tuple`: A tuple ``(responses, error)``. ``responses`` is a list with the tower responses of the
+            accepted appointments (in the same order), as returned by ``add_appointment``. ``error`` is the exception
+            that rejected the next appointment (``AppointmentLimitReached``, ``AuthenticationFailure``,
+            ``NotEnoughSlots``, ``SubscriptionExpired`` or ``AppointmentAlreadyTriggered``), or :obj:`None` if all of
+            them were accepted.
+        """
+
+        start_block = self.block_processor.get_block(self.last_known_block).get("height")
+        responses = []
+
+        for appointment, user_signature in appointments:
+            try:
+                responses.append(self._add_appointment(appointment, user_signature, start_block))
+
+            except (
+                AppointmentLimitReached,
+                AuthenticationFailure,
+                NotEnoughSlots,
+                SubscriptionExpired,
+                AppointmentAlreadyTriggered,
+            ) as e:
+                return responses, e
+
+        return responses, None
+
+    def _add_appointment(self, appointment, user_signature, start_block=None):
+        """
+        Adds a new appointment to the :obj:`Watcher`. See ``add_appointment``.
+
+        Args:
+            appointment (:obj:`Appointment <common.appointment.Appointment>`): the appointment to be added to the
+                :obj:`Watcher`.
+            user_signature (:obj:`str`): the user's appointment signature (hex-encoded).
+            start_block (:obj:`int`): the height the appointment starts at. Queried from ``bitcoind`` if not provided.
+
+        Returns:
+            :obj:`dict`: The tower response as a dict, containing: ``locator``, ``signature``, ``available_slots`` and
+            ``subscription_expiry``.
+        """
+
         if len(self.appointments) >= self.max_appointments:
             message = "Maximum appointments reached, appointment rejected"
             self.logger.info(message, locator=appointment.locator)
@@ -358,7 +421,9 @@ class Watcher:
             raise SubscriptionExpired(
                 f"Your subscription expired at block {self.gatekeeper.registered_users[user_id].subscription_expiry}"
             )
-        start_block = self.block_processor.get_block(self.last_known_block).get("height")
+        if start_block is None:
+            start_block = self.block_processor.get_block(self.last_known_block).get("height")
+
         extended_appointment = ExtendedAppointment(
             appointment.locator,
             appointment.encrypted_blob,
@@ -478,7 +543,7 @@ class Watcher:
 
             txids = block.get("tx")
             # Compute the locator for every transaction in the block and add them to the cache
-            locator_txid_map = {compute_locator(txid): txid for txid in txids}
+            locator_txid_map = compute_locator_txid_map(txids)
             self.locator_cache.update(block_hash, locator_txid_map)
 
             if len(self.appointments) > 0 and locator_txid_map:
@@ -544,6 +609,7 @@ class Watcher:
             self.db_manager.store_last_block_hash_watcher(block_hash)
             self.last_known_block = block.get("hash")
             self.block_queue.task_done()
+            self.block_processed.set()
 
     def get_breaches(self, locator_txid_map):
         """
@@ -558,9 +624,9 @@ class Watcher:
             found.
         """
 
-        # Check is any of the tx_ids in the received block is an actual match
-        intersection = set(self.locator_uuid_map.keys()).intersection(locator_txid_map.keys())
-        breaches = {locator: locator_txid_map[locator] for locator in intersection}
+        # Check is any of the tx_ids in the received block is an actual match. The block locators are probed against the
+        # map directly so no copy of the (potentially much bigger) appointment locator set has to be built per block.
+        breaches = {locator: txid for locator, txid in locator_txid_map.items() if locator in self.locator_uuid_map}
 
         if len(breaches) > 0:
             self.logger.info("List of breaches", breaches=breaches)
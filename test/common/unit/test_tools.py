@@ -6,6 +6,7 @@ from common.tools import (
     is_256b_hex_str,
     is_locator,
     compute_locator,
+    compute_locator_txid_map,
     setup_data_folder,
     is_u4int,
     intify,
@@ -100,6 +101,15 @@ def test_compute_locator():
         assert is_locator(compute_locator(get_random_value_hex(i))) is False
 
 
+def test_compute_locator_txid_map():
+    # The map should match computing the locators one by one
+    txids = [get_random_value_hex(32) for _ in range(100)]
+    assert compute_locator_txid_map(txids) == {compute_locator(txid): txid for txid in txids}
+
+    # An empty list results in an empty map
+    assert compute_locator_txid_map([]) == {}
+
+
 def test_setup_data_folder():
     # This method should create a folder if it does not exist, and do nothing otherwise
     test_folder = "test_folder"
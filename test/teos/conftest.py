@@ -107,6 +107,14 @@ def get_random_value_hex(nbytes):
     return prv_hex.zfill(2 * nbytes)
 
 
+def get_random_values_hex(n, nbytes):
+    # Draws all the values at once and splits the hex string, which is way cheaper than calling get_random_value_hex n
+    # times for big sets
+    hex_len = 2 * nbytes
+    prv_hex = "{:x}".format(random.getrandbits(8 * nbytes * n)).zfill(hex_len * n)
+    return [prv_hex[i : i + hex_len] for i in range(0, hex_len * n, hex_len)]
+
+
 def get_utxo():
     global utxos
     if not utxos:
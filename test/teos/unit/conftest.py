@@ -5,7 +5,8 @@ from coincurve import PrivateKey
 from teos.carrier import Carrier
 from teos.users_dbm import UsersDBM
 from teos.gatekeeper import Gatekeeper
-from teos.responder import TransactionTracker
+from teos.watcher import Watcher
+from teos.responder import Responder, TransactionTracker
 from teos.block_processor import BlockProcessor
 from teos.appointments_dbm import AppointmentsDBM
 from teos.extended_appointment import ExtendedAppointment
@@ -71,6 +72,93 @@ def gatekeeper(user_db_manager, block_processor):
     )
 
 
+class FakeChainMonitor:
+    """
+    Feeds synthetic blocks to a set of receiving queues without the need of ``bitcoind``.
+
+    The generated blocks are chained on top of each other and can be queried through ``get_block``, so the same
+    instance can be used as the ``block_processor`` of the components being fed.
+
+    Args:
+        receiving_queues (:obj:`list`): a list of :obj:`Queue` objects to be notified about the new blocks. More can be
+            appended later on, once the components to be fed are created.
+    """
+
+    def __init__(self, receiving_queues=None):
+        self.receiving_queues = receiving_queues if receiving_queues is not None else []
+        self.blocks = {}
+        self.best_block_hash = None
+
+    def get_block(self, block_hash):
+        return self.blocks.get(block_hash)
+
+    def get_best_block_hash(self):
+        return self.best_block_hash
+
+    def get_block_count(self):
+        return self.blocks[self.best_block_hash].get("height") if self.best_block_hash else -1
+
+    def emit_blocks(self, n, txids=None):
+        # Every block gets the given txids, or a single random one (like a coinbase) if none are provided
+        block_hashes = []
+        for _ in range(n):
+            block_hash = get_random_value_hex(32)
+            self.blocks[block_hash] = {
+                "hash": block_hash,
+                "previousblockhash": self.best_block_hash,
+                "height": self.get_block_count() + 1,
+                "tx": txids or [get_random_value_hex(32)],
+            }
+            self.best_block_hash = block_hash
+            block_hashes.append(block_hash)
+
+            for queue in self.receiving_queues:
+                queue.put(block_hash)
+
+        return block_hashes
+
+
+@pytest.fixture
+def fake_chain_watcher(user_db_manager):
+    # Builds Watchers fed by a FakeChainMonitor. Each of them gets its own db, so they do not share storage with the
+    # bitcoind-backed one (or with each other)
+    db_managers = {}
+
+    def _fake_chain_watcher(max_appointments, n_blocks):
+        chain_monitor = FakeChainMonitor()
+        chain_monitor.emit_blocks(n_blocks)
+
+        db_name = get_random_value_hex(8)
+        db_manager = db_managers[db_name] = AppointmentsDBM(db_name)
+        gatekeeper = Gatekeeper(
+            user_db_manager,
+            chain_monitor,
+            config.get("SUBSCRIPTION_SLOTS"),
+            config.get("SUBSCRIPTION_DURATION"),
+            config.get("EXPIRY_DELTA"),
+        )
+        responder = Responder(db_manager, gatekeeper, None, chain_monitor)
+        watcher = Watcher(
+            db_manager,
+            gatekeeper,
+            chain_monitor,
+            responder,
+            generate_keypair()[0],
+            max_appointments,
+            config.get("LOCATOR_CACHE_SIZE"),
+        )
+        watcher.last_known_block = chain_monitor.get_best_block_hash()
+        chain_monitor.receiving_queues.append(watcher.block_queue)
+
+        return watcher, chain_monitor
+
+    yield _fake_chain_watcher
+
+    for db_name, db_manager in db_managers.items():
+        db_manager.db.close()
+        rmtree(db_name)
+
+
 def generate_keypair():
     sk = PrivateKey()
     pk = sk.public_key
@@ -121,6 +121,22 @@ def test_create_append_locator_map(db_manager):
     assert set(db_manager.load_locator_map(locator)) == set([uuid, uuid2])
 
 
+def test_batch_create_append_locator_maps(db_manager):
+    locator_uuid_map = {get_random_value_hex(LOCATOR_LEN_BYTES): [uuid4().hex] for _ in range(10)}
+    db_manager.batch_create_append_locator_maps(locator_uuid_map)
+
+    # Check that all the locator maps have been properly stored
+    for locator, uuids in locator_uuid_map.items():
+        assert db_manager.load_locator_map(locator) == uuids
+
+    # Adding data for existing locators appends to the maps, skipping the uuids that are already there
+    new_uuids = {locator: uuids + [uuid4().hex] for locator, uuids in locator_uuid_map.items()}
+    db_manager.batch_create_append_locator_maps(new_uuids)
+
+    for locator, uuids in new_uuids.items():
+        assert db_manager.load_locator_map(locator) == uuids
+
+
 def test_update_locator_map(db_manager):
     # Let's create a couple of appointments with the same locator
     locator = get_random_value_hex(32)
@@ -198,6 +214,20 @@ def test_store_watcher_appointment_wrong(db_manager, watcher_appointments):
         assert db_manager.store_watcher_appointment(42, appointment.to_dict()) is False
 
 
+def test_batch_store_watcher_appointments_wrong(db_manager):
+    # If any of the appointments cannot be serialized none of them should be stored
+    uuid_ok, uuid_wrong = uuid4().hex, uuid4().hex
+    appointments = {uuid_ok: {"locator": get_random_value_hex(LOCATOR_LEN_BYTES)}, uuid_wrong: {"locator": object()}}
+
+    assert db_manager.batch_store_watcher_appointments(appointments) is False
+    db_appointments = db_manager.load_watcher_appointments()
+    assert uuid_ok not in db_appointments and uuid_wrong not in db_appointments
+
+    # Same for wrong uuid types
+    assert db_manager.batch_store_watcher_appointments({uuid_ok: {}, 42: {}}) is False
+    assert uuid_ok not in db_manager.load_watcher_appointments()
+
+
 def test_load_watcher_appointment_wrong(db_manager):
     # Random keys should fail
     assert db_manager.load_watcher_appointment(get_random_value_hex(16)) is None
@@ -222,6 +252,20 @@ def test_store_load_watcher_appointment(db_manager, watcher_appointments):
         assert appointment.to_dict() == db_watcher_appointments[uuid]
 
 
+def test_batch_store_watcher_appointments(db_manager, watcher_appointments):
+    # Clear the appointments stored by the previous test so we can check the batch adds them back
+    db_manager.batch_delete_watcher_appointments(watcher_appointments.keys())
+    assert not set(db_manager.load_watcher_appointments().keys()).intersection(watcher_appointments.keys())
+
+    db_manager.batch_store_watcher_appointments(
+        {uuid: appointment.to_dict() for uuid, appointment in watcher_appointments.items()}
+    )
+    db_watcher_appointments = db_manager.load_watcher_appointments()
+
+    for uuid, appointment in watcher_appointments.items():
+        assert appointment.to_dict() == db_watcher_appointments[uuid]
+
+
 def test_store_load_triggered_appointment(generate_dummy_appointment, db_manager):
     db_watcher_appointments = db_manager.load_watcher_appointments()
     db_watcher_appointments_with_triggered = db_manager.load_watcher_appointments(include_triggered=True)
@@ -1,7 +1,8 @@
 import pytest
-from uuid import uuid4
 from shutil import rmtree
-from copy import deepcopy
+from base64 import b85decode
+from hypothesis import given, settings, strategies as st
+from copy import copy, deepcopy
 from threading import Thread
 from coincurve import PrivateKey
 
@@ -11,6 +12,7 @@ from teos.gatekeeper import UserInfo
 from teos.chain_monitor import ChainMonitor
 from teos.block_processor import BlockProcessor
 from teos.appointments_dbm import AppointmentsDBM
+from teos.extended_appointment import ExtendedAppointment
 from teos.gatekeeper import Gatekeeper, AuthenticationFailure, NotEnoughSlots, SubscriptionExpired
 from teos.watcher import (
     Watcher,
@@ -29,7 +31,7 @@ from common.cryptographer import Cryptographer
 from test.teos.conftest import (
     config,
     generate_blocks,
-    generate_blocks_with_delay,
+    get_random_values_hex,
     create_txs,
     bitcoin_cli,
     generate_block_with_transactions,
@@ -44,11 +46,25 @@ from test.teos.unit.conftest import (
 APPOINTMENTS = 5
 TEST_SET_SIZE = 200
 
-signing_key, public_key = generate_keypair()
-
 # Reduce the maximum number of appointments to something we can test faster
 MAX_APPOINTMENTS = 100
 
+# A valid penalty transaction encrypted using VALID_DISPUTE_TXID (base85-encoded to keep the literal short)
+VALID_DISPUTE_TXID = "0437cd7f8525ceed2324359c2d0ba26006d92d856a9c20fa0241106ee5a597c9"
+VALID_ENCRYPTED_BLOB = b85decode(
+    b"rYfnsJcW_u)!q>Cy-C}WLoDJn8ueFV&B-Jz2xc#r_4Iw9p{j^CH3-daXXt+K-Rz*w>5Lg?>>M7;w8iMZ2&yI(k`(5^yh|*6B!7qJU>z05M*L"
+    b"238|ho1<6{64fD?<UrdtNYs&82<AvQJcb~%LABBa74fkhC=_p1m2^KD9K_3nMslLrt0P;?R+7c42hx_Rwne!BPP`mwv&q6j4(^+<2(-z-MsI"
+    b"(=rX`P;l-XSG^1v9rXGozqH4Ep?j<!d}fJ0QOefP?ToZN1I!cqWapr%$~@Rji{HJpX%PCbunZz5H^qQNliMcNrT{BZ194lkp<%Tr^kXAnIoI"
+    b"0-r*@gtk>A4DTzy6G3iS~oc@h2pCRdVu2Vv%43X#"
+).hex()
+
+
+@pytest.fixture(scope="session")
+def signing_key():
+    # The tower key is only created if a test needs it, and once per run
+    sk, _ = generate_keypair()
+    return sk
+
 
 @pytest.fixture(scope="session")
 def temp_db_manager():
@@ -62,7 +78,7 @@ def temp_db_manager():
 
 
 @pytest.fixture(scope="module")
-def watcher(run_bitcoind, db_manager, gatekeeper):
+def watcher(run_bitcoind, db_manager, gatekeeper, signing_key):
     block_processor = BlockProcessor(bitcoind_connect_params)
     carrier = Carrier(bitcoind_connect_params)
 
@@ -90,12 +106,12 @@ def watcher(run_bitcoind, db_manager, gatekeeper):
 
 @pytest.fixture(scope="module")
 def txids():
-    return [get_random_value_hex(32) for _ in range(100)]
+    return get_random_values_hex(100, 32)
 
 
 @pytest.fixture(scope="module")
 def locator_uuid_map(txids):
-    return {compute_locator(txid): uuid4().hex for txid in txids}
+    return {compute_locator(txid): get_random_value_hex(16) for txid in txids}
 
 
 # FIXME: 194 will do with dummy appointment
@@ -106,7 +122,7 @@ def create_appointments(generate_dummy_appointment, n):
 
     for i in range(n):
         appointment, dispute_tx = generate_dummy_appointment()
-        uuid = uuid4().hex
+        uuid = get_random_value_hex(16)
 
         appointments[uuid] = appointment
         locator_uuid_map[appointment.locator] = [uuid]
@@ -115,6 +131,13 @@ def create_appointments(generate_dummy_appointment, n):
     return appointments, locator_uuid_map, dispute_txs
 
 
+def wait_until_processed(watcher, block_hash, timeout=5):
+    # Waits until the Watcher has processed the given block, so we don't depend on fixed delays
+    while watcher.last_known_block != block_hash:
+        assert watcher.block_processed.wait(timeout)
+        watcher.block_processed.clear()
+
+
 def test_locator_cache_init_not_enough_blocks(block_processor):
     locator_cache = LocatorCache(config.get("LOCATOR_CACHE_SIZE"))
     # Make sure there are at least 3 blocks
@@ -161,7 +184,7 @@ def test_update_cache():
     locator_cache = LocatorCache(config.get("LOCATOR_CACHE_SIZE"))
 
     block_hash = get_random_value_hex(32)
-    txs = [get_random_value_hex(32) for _ in range(10)]
+    txs = get_random_values_hex(10, 32)
     locator_txid_map = {compute_locator(txid): txid for txid in txs}
 
     # Cache is empty
@@ -183,7 +206,7 @@ def test_update_cache_full():
 
     for i in range(locator_cache.cache_size):
         block_hash = get_random_value_hex(32)
-        txs = [get_random_value_hex(32) for _ in range(10)]
+        txs = get_random_values_hex(10, 32)
         locator_txid_map = {compute_locator(txid): txid for txid in txs}
         locator_cache.update(block_hash, locator_txid_map)
 
@@ -201,7 +224,7 @@ def test_update_cache_full():
 
     # Add one more
     block_hash = get_random_value_hex(32)
-    txs = [get_random_value_hex(32) for _ in range(10)]
+    txs = get_random_values_hex(10, 32)
     locator_txid_map = {compute_locator(txid): txid for txid in txs}
     locator_cache.update(block_hash, locator_txid_map)
 
@@ -222,10 +245,10 @@ def test_locator_cache_is_full():
     locator_cache = LocatorCache(config.get("LOCATOR_CACHE_SIZE"))
 
     for _ in range(locator_cache.cache_size):
-        locator_cache.blocks[uuid4().hex] = 0
+        locator_cache.blocks[get_random_value_hex(16)] = 0
         assert not locator_cache.is_full()
 
-    locator_cache.blocks[uuid4().hex] = 0
+    locator_cache.blocks[get_random_value_hex(16)] = 0
     assert locator_cache.is_full()
 
 
@@ -379,7 +402,7 @@ def test_add_appointment(watcher, generate_dummy_appointment):
 
     response = watcher.add_appointment(appointment, appointment_signature)
     assert response.get("locator") == appointment.locator
-    assert Cryptographer.get_compressed_pk(watcher.signing_key.public_key) == Cryptographer.get_compressed_pk(
+    assert watcher.tower_id == Cryptographer.get_compressed_pk(
         Cryptographer.recover_pk(
             receipts.create_appointment_receipt(appointment_signature, response.get("start_block")),
             response.get("signature"),
@@ -387,10 +410,26 @@ def test_add_appointment(watcher, generate_dummy_appointment):
     )
     assert response.get("available_slots") == available_slots - 1
 
+
+# FIXME: 194 will do with dummy appointment
+def test_add_duplicate_appointment(watcher, generate_dummy_appointment):
+    # Simulate the user is registered
+    user_sk, user_pk = generate_keypair()
+    available_slots = 100
+    user_id = Cryptographer.get_compressed_pk(user_pk)
+    watcher.gatekeeper.registered_users[user_id] = UserInfo(
+        available_slots=available_slots, subscription_expiry=watcher.block_processor.get_block_count() + 1
+    )
+
+    tower_id = watcher.tower_id
+    appointment, dispute_tx = generate_dummy_appointment()
+    appointment_signature = Cryptographer.sign(appointment.serialize(), user_sk)
+    watcher.add_appointment(appointment, appointment_signature)
+
     # Check that we can also add an already added appointment (same locator)
     response = watcher.add_appointment(appointment, appointment_signature)
     assert response.get("locator") == appointment.locator
-    assert Cryptographer.get_compressed_pk(watcher.signing_key.public_key) == Cryptographer.get_compressed_pk(
+    assert tower_id == Cryptographer.get_compressed_pk(
         Cryptographer.recover_pk(
             receipts.create_appointment_receipt(appointment_signature, response.get("start_block")),
             response.get("signature"),
@@ -410,7 +449,7 @@ def test_add_appointment(watcher, generate_dummy_appointment):
     appointment_signature = Cryptographer.sign(appointment.serialize(), another_user_sk)
     response = watcher.add_appointment(appointment, appointment_signature)
     assert response.get("locator") == appointment.locator
-    assert Cryptographer.get_compressed_pk(watcher.signing_key.public_key) == Cryptographer.get_compressed_pk(
+    assert tower_id == Cryptographer.get_compressed_pk(
         Cryptographer.recover_pk(
             receipts.create_appointment_receipt(appointment_signature, response.get("start_block")),
             response.get("signature"),
@@ -444,7 +483,7 @@ def test_add_appointment_in_cache(watcher, generate_dummy_appointment):
     assert (
         response
         and response.get("locator") == appointment.locator
-        and Cryptographer.get_compressed_pk(watcher.signing_key.public_key)
+        and watcher.tower_id
         == Cryptographer.get_compressed_pk(Cryptographer.recover_pk(appointment_receipt, response.get("signature")))
     )
     assert not watcher.locator_uuid_map.get(appointment.locator)
@@ -492,7 +531,7 @@ def test_add_appointment_in_cache_invalid_blob(watcher):
     assert (
         response
         and response.get("locator") == appointment.locator
-        and Cryptographer.get_compressed_pk(watcher.signing_key.public_key)
+        and watcher.tower_id
         == Cryptographer.get_compressed_pk(Cryptographer.recover_pk(appointment_receipt, response.get("signature")))
     )
 
@@ -522,7 +561,7 @@ def test_add_appointment_in_cache_invalid_transaction(watcher, generate_dummy_ap
     assert (
         response
         and response.get("locator") == appointment.locator
-        and Cryptographer.get_compressed_pk(watcher.signing_key.public_key)
+        and watcher.tower_id
         == Cryptographer.get_compressed_pk(Cryptographer.recover_pk(appointment_receipt, response.get("signature")))
     )
 
@@ -541,16 +580,19 @@ def test_add_too_many_appointments(watcher, generate_dummy_appointment):
     )
 
     # Appointments on top of the limit should be rejected
-    watcher.appointments = dict()
+    watcher.appointments.clear()
 
-    for i in range(MAX_APPOINTMENTS):
-        appointment, dispute_tx = generate_dummy_appointment()
-        appointment_signature = Cryptographer.sign(appointment.serialize(), user_sk)
-        response = watcher.add_appointment(appointment, appointment_signature)
+    appointments = [generate_dummy_appointment()[0] for _ in range(MAX_APPOINTMENTS)]
+    signatures = [Cryptographer.sign(appointment.serialize(), user_sk) for appointment in appointments]
+    responses, error = watcher.batch_add_appointments(list(zip(appointments, signatures)))
+    assert error is None and len(responses) == MAX_APPOINTMENTS
+
+    tower_id = watcher.tower_id
+    for i, (appointment, appointment_signature, response) in enumerate(zip(appointments, signatures, responses)):
         appointment_receipt = receipts.create_appointment_receipt(appointment_signature, response.get("start_block"))
 
         assert response.get("locator") == appointment.locator
-        assert Cryptographer.get_compressed_pk(watcher.signing_key.public_key) == Cryptographer.get_compressed_pk(
+        assert tower_id == Cryptographer.get_compressed_pk(
             Cryptographer.recover_pk(appointment_receipt, response.get("signature"))
         )
         assert response.get("available_slots") == available_slots - (i + 1)
@@ -561,6 +603,41 @@ def test_add_too_many_appointments(watcher, generate_dummy_appointment):
         watcher.add_appointment(appointment, appointment_signature)
 
 
+def test_batch_add_appointments_limit_reached(fake_chain_watcher):
+    # If the limit is reached halfway through a batch, the appointments accepted so far are kept and their responses
+    # are returned alongside the error. The appointments are never triggered, so the chain can be faked
+    max_appointments = 3
+    watcher, chain_monitor = fake_chain_watcher(max_appointments, 1)
+
+    # Simulate the user is registered
+    user_sk, user_pk = generate_keypair()
+    available_slots = 100
+    user_id = Cryptographer.get_compressed_pk(user_pk)
+    watcher.gatekeeper.registered_users[user_id] = UserInfo(
+        available_slots=available_slots, subscription_expiry=chain_monitor.get_block_count() + 1
+    )
+
+    appointments = [
+        Appointment(compute_locator(txid), get_random_value_hex(100), 20)
+        for txid in get_random_values_hex(max_appointments + 2, 32)
+    ]
+    signatures = [Cryptographer.sign(appointment.serialize(), user_sk) for appointment in appointments]
+    responses, error = watcher.batch_add_appointments(list(zip(appointments, signatures)))
+
+    assert isinstance(error, AppointmentLimitReached)
+    assert len(responses) == len(watcher.appointments) == max_appointments
+
+    tower_id = watcher.tower_id
+    for i, (appointment, appointment_signature, response) in enumerate(zip(appointments, signatures, responses)):
+        appointment_receipt = receipts.create_appointment_receipt(appointment_signature, response.get("start_block"))
+
+        assert response.get("locator") == appointment.locator
+        assert tower_id == Cryptographer.get_compressed_pk(
+            Cryptographer.recover_pk(appointment_receipt, response.get("signature"))
+        )
+        assert response.get("available_slots") == available_slots - (i + 1)
+
+
 def test_do_watch(watcher, temp_db_manager, generate_dummy_appointment):
     watcher.db_manager = temp_db_manager
 
@@ -568,8 +645,9 @@ def test_do_watch(watcher, temp_db_manager, generate_dummy_appointment):
     appointments, locator_uuid_map, dispute_txs = create_appointments(generate_dummy_appointment, APPOINTMENTS)
 
     # Set the data into the Watcher and in the db
-    watcher.locator_uuid_map = locator_uuid_map
-    watcher.appointments = {}
+    watcher.locator_uuid_map.clear()
+    watcher.locator_uuid_map.update(locator_uuid_map)
+    watcher.appointments.clear()
     watcher.gatekeeper.registered_users = {}
 
     # Simulate a register (times out in 10 bocks)
@@ -578,13 +656,16 @@ def test_do_watch(watcher, temp_db_manager, generate_dummy_appointment):
         available_slots=100, subscription_expiry=watcher.block_processor.get_block_count() + 10
     )
 
-    # Add the appointments
-    for uuid, appointment in appointments.items():
-        watcher.appointments[uuid] = {"locator": appointment.locator, "user_id": user_id}
-        # Assume the appointment only takes one slot
-        watcher.gatekeeper.registered_users[user_id].appointments[uuid] = 1
-        watcher.db_manager.store_watcher_appointment(uuid, appointment.to_dict())
-        watcher.db_manager.create_append_locator_map(appointment.locator, uuid)
+    # Add the appointments (assume each appointment only takes one slot)
+    watcher.appointments.update(
+        {uuid: {"locator": appointment.locator, "user_id": user_id} for uuid, appointment in appointments.items()}
+    )
+    watcher.gatekeeper.registered_users[user_id].appointments.update({uuid: 1 for uuid in appointments})
+
+    watcher.db_manager.batch_store_watcher_appointments(
+        {uuid: appointment.to_dict() for uuid, appointment in appointments.items()}
+    )
+    watcher.db_manager.batch_create_append_locator_maps(locator_uuid_map)
 
     do_watch_thread = Thread(target=watcher.do_watch, daemon=True)
     do_watch_thread.start()
@@ -593,13 +674,22 @@ def test_do_watch(watcher, temp_db_manager, generate_dummy_appointment):
     for dispute_tx in dispute_txs[:2]:
         bitcoin_cli.sendrawtransaction(dispute_tx)
 
+    # The Watcher and the db hold their own copies of the data from now on, so the local one can be freed
+    del appointments, locator_uuid_map
+    dispute_txs.clear()
+
     # After generating a block, the appointment count should have been reduced by 2 (two breaches)
-    generate_blocks_with_delay(1)
+    block_ids = generate_blocks(1)
+    wait_until_processed(watcher, block_ids[-1])
 
     assert len(watcher.appointments) == APPOINTMENTS - 2
 
-    # The rest of appointments will timeout after the subscription times-out (9 more blocks) + EXPIRY_DELTA
-    generate_blocks_with_delay(9 + config.get("EXPIRY_DELTA"))
+    # The rest of appointments will timeout after the subscription times-out (9 more blocks) + EXPIRY_DELTA. Blocks are
+    # mined one by one so none of them is skipped while the Watcher is catching up (the cleanup only triggers at the
+    # exact expiry height)
+    for _ in range(9 + config.get("EXPIRY_DELTA")):
+        block_id = generate_blocks(1)[0]
+        wait_until_processed(watcher, block_id)
     assert len(watcher.appointments) == 0
 
     # FIXME: We should also add cases where the transactions are invalid.
@@ -616,7 +706,8 @@ def test_do_watch_cache_update(watcher):
         rest_of_blocks = list(blocks_in_cache.keys())[1:]
         assert len(watcher.locator_cache.blocks) == watcher.locator_cache.cache_size
 
-        generate_blocks_with_delay(1)
+        block_ids = generate_blocks(1)
+        wait_until_processed(watcher, block_ids[-1])
 
         # The last oldest block is gone but the rest remain
         assert oldest_block_hash not in watcher.locator_cache.blocks
@@ -633,9 +724,62 @@ def test_do_watch_cache_update(watcher):
         assert len(watcher.locator_cache.blocks) == watcher.locator_cache.cache_size
 
 
+def test_do_watch_fake_chain(fake_chain_watcher):
+    # Same as test_do_watch but for the cases where no valid transaction needs to be handed to the Responder, so the
+    # chain can be faked and blocks are fed straight to the Watcher
+    watcher, chain_monitor = fake_chain_watcher(MAX_APPOINTMENTS, config.get("LOCATOR_CACHE_SIZE"))
+
+    # Simulate a register (times out in 10 bocks)
+    user_id = "02" + get_random_value_hex(32)
+    subscription_expiry = chain_monitor.get_block_count() + 10
+    watcher.gatekeeper.registered_users[user_id] = UserInfo(
+        available_slots=100, subscription_expiry=subscription_expiry
+    )
+
+    # Add appointments with data that cannot be decrypted
+    dispute_txids = get_random_values_hex(APPOINTMENTS, 32)
+    appointments = {}
+    for dispute_txid in dispute_txids:
+        uuid = get_random_value_hex(16)
+        appointments[uuid] = ExtendedAppointment(
+            compute_locator(dispute_txid),
+            get_random_value_hex(100),
+            20,
+            user_id,
+            get_random_value_hex(50),
+            chain_monitor.get_block_count(),
+        )
+        watcher.appointments[uuid] = appointments[uuid].get_summary()
+        watcher.locator_uuid_map[appointments[uuid].locator] = [uuid]
+        watcher.gatekeeper.registered_users[user_id].appointments[uuid] = 1
+
+    watcher.db_manager.batch_store_watcher_appointments(
+        {uuid: appointment.to_dict() for uuid, appointment in appointments.items()}
+    )
+    watcher.db_manager.batch_create_append_locator_maps(watcher.locator_uuid_map)
+
+    watcher_thread = watcher.awake()
+
+    # Triggering two of them should get them deleted (the breaches are invalid)
+    block_hashes = chain_monitor.emit_blocks(1, txids=dispute_txids[:2])
+    wait_until_processed(watcher, block_hashes[-1])
+    assert len(watcher.appointments) == APPOINTMENTS - 2
+
+    # The rest of appointments will be deleted once the subscription is outdated (expired + EXPIRY_DELTA)
+    block_hashes = chain_monitor.emit_blocks(
+        subscription_expiry + config.get("EXPIRY_DELTA") - chain_monitor.get_block_count()
+    )
+    wait_until_processed(watcher, block_hashes[-1])
+    assert len(watcher.appointments) == 0
+
+    watcher.block_queue.put(ChainMonitor.END_MESSAGE)
+    watcher_thread.join()
+
+
 # FIXME: 194 will do with dummy watcher
 def test_get_breaches(watcher, txids, locator_uuid_map):
-    watcher.locator_uuid_map = locator_uuid_map
+    watcher.locator_uuid_map.clear()
+    watcher.locator_uuid_map.update(locator_uuid_map)
     locators_txid_map = {compute_locator(txid): txid for txid in txids}
     potential_breaches = watcher.get_breaches(locators_txid_map)
 
@@ -644,15 +788,17 @@ def test_get_breaches(watcher, txids, locator_uuid_map):
 
 
 # FIXME: 194 will do with dummy watcher
-def test_get_breaches_random_data(watcher, locator_uuid_map):
-    # The likelihood of finding a potential breach with random data should be negligible
-    watcher.locator_uuid_map = locator_uuid_map
-    txids = [get_random_value_hex(32) for _ in range(TEST_SET_SIZE)]
-    locators_txid_map = {compute_locator(txid): txid for txid in txids}
+@settings(max_examples=TEST_SET_SIZE, deadline=None)
+@given(txid=st.binary(min_size=32, max_size=32).map(lambda b: b.hex()))
+def test_get_breaches_random_data(watcher, locator_uuid_map, txid):
+    # The likelihood of finding a potential breach with random data should be negligible. Each txid is checked as a
+    # separate example, so a failure reports the (shrunk) offending txid
+    watcher.locator_uuid_map.clear()
+    watcher.locator_uuid_map.update(locator_uuid_map)
 
-    potential_breaches = watcher.get_breaches(locators_txid_map)
+    potential_breaches = watcher.get_breaches({compute_locator(txid): txid})
 
-    # None of the txids should breach
+    # The txid should not breach
     assert len(potential_breaches) == 0
 
 
@@ -660,7 +806,7 @@ def test_get_breaches_random_data(watcher, locator_uuid_map):
 def test_check_breach(watcher, generate_dummy_appointment):
     # A breach will be flagged as valid only if the encrypted blob can be properly decrypted and the resulting data
     # matches a transaction format.
-    uuid = uuid4().hex
+    uuid = get_random_value_hex(16)
     appointment, dispute_tx = generate_dummy_appointment()
     dispute_txid = watcher.block_processor.decode_raw_transaction(dispute_tx).get("txid")
 
@@ -671,7 +817,7 @@ def test_check_breach(watcher, generate_dummy_appointment):
 # FIXME: 194 will do with dummy watcher and appointment
 def test_check_breach_random_data(watcher, generate_dummy_appointment):
     # If a breach triggers an appointment with random data as encrypted blob, the check should fail.
-    uuid = uuid4().hex
+    uuid = get_random_value_hex(16)
     appointment, dispute_tx = generate_dummy_appointment()
     dispute_txid = watcher.block_processor.decode_raw_transaction(dispute_tx).get("txid")
 
@@ -686,7 +832,7 @@ def test_check_breach_random_data(watcher, generate_dummy_appointment):
 def test_check_breach_invalid_transaction(watcher, generate_dummy_appointment):
     # If the breach triggers an appointment with data that can be decrypted but does not match a transaction, it should
     # fail
-    uuid = uuid4().hex
+    uuid = get_random_value_hex(16)
     appointment, dispute_tx = generate_dummy_appointment()
     dispute_txid = watcher.block_processor.decode_raw_transaction(dispute_tx).get("txid")
 
@@ -699,31 +845,22 @@ def test_check_breach_invalid_transaction(watcher, generate_dummy_appointment):
 
 # FIXME: 194 will do with dummy watcher
 def test_filter_valid_breaches(watcher, generate_dummy_appointment):
-    dispute_txid = "0437cd7f8525ceed2324359c2d0ba26006d92d856a9c20fa0241106ee5a597c9"
-    encrypted_blob = (
-        "a62aa9bb3c8591e4d5de10f1bd49db92432ce2341af55762cdc9242c08662f97f5f47da0a1aa88373508cd6e67e87eefddeca0cee98c1"
-        "967ec1c1ecbb4c5e8bf08aa26159214e6c0bc4b2c7c247f87e7601d15c746fc4e711be95ba0e363001280138ba9a65b06c4aa6f592b21"
-        "3635ee763984d522a4c225814510c8f7ab0801f36d4a68f5ee7dd3930710005074121a172c29beba79ed647ebaf7e7fab1bbd9a208251"
-        "ef5486feadf2c46e33a7d66adf9dbbc5f67b55a34b1b3c4909dd34a482d759b0bc25ecd2400f656db509466d7479b5b92a2fadabccc9e"
-        "c8918da8979a9feadea27531643210368fee494d3aaa4983e05d6cf082a49105e2f8a7c7821899239ba7dee12940acd7d8a629894b5d31"
-        "e94b439cfe8d2e9f21e974ae5342a70c91e8"
-    )
-
     dummy_appointment, _ = generate_dummy_appointment()
-    dummy_appointment.encrypted_blob = encrypted_blob
-    dummy_appointment.locator = compute_locator(dispute_txid)
-    uuid = uuid4().hex
+    dummy_appointment.encrypted_blob = VALID_ENCRYPTED_BLOB
+    dummy_appointment.locator = compute_locator(VALID_DISPUTE_TXID)
+    uuid = get_random_value_hex(16)
 
     appointments = {uuid: dummy_appointment}
     locator_uuid_map = {dummy_appointment.locator: [uuid]}
-    breaches = {dummy_appointment.locator: dispute_txid}
+    breaches = {dummy_appointment.locator: VALID_DISPUTE_TXID}
 
     for uuid, appointment in appointments.items():
         watcher.appointments[uuid] = {"locator": appointment.locator, "user_id": appointment.user_id}
         watcher.db_manager.store_watcher_appointment(uuid, dummy_appointment.to_dict())
-        watcher.db_manager.create_append_locator_map(dummy_appointment.locator, uuid)
 
-    watcher.locator_uuid_map = locator_uuid_map
+    # filter_breaches only reads the in-memory locator map, so there is no need to store it in the db
+    watcher.locator_uuid_map.clear()
+    watcher.locator_uuid_map.update(locator_uuid_map)
 
     valid_breaches, invalid_breaches = watcher.filter_breaches(breaches)
 
@@ -734,15 +871,19 @@ def test_filter_valid_breaches(watcher, generate_dummy_appointment):
 # FIXME: 194 will do with dummy watcher and appointment
 def test_filter_breaches_random_data(watcher, generate_dummy_appointment):
     appointments = {}
+    db_appointments = {}
     locator_uuid_map = {}
     breaches = {}
 
+    # Only the locators need to differ, so a single appointment is generated and the rest are cloned from it
+    template_appointment, _ = generate_dummy_appointment()
+
     for i in range(TEST_SET_SIZE):
-        dummy_appointment, _ = generate_dummy_appointment()
-        uuid = uuid4().hex
+        dummy_appointment = copy(template_appointment)
+        dummy_appointment.locator = get_random_value_hex(16)
+        uuid = get_random_value_hex(16)
         appointments[uuid] = {"locator": dummy_appointment.locator, "user_id": dummy_appointment.user_id}
-        watcher.db_manager.store_watcher_appointment(uuid, dummy_appointment.to_dict())
-        watcher.db_manager.create_append_locator_map(dummy_appointment.locator, uuid)
+        db_appointments[uuid] = dummy_appointment.to_dict()
 
         locator_uuid_map[dummy_appointment.locator] = [uuid]
 
@@ -750,8 +891,11 @@ def test_filter_breaches_random_data(watcher, generate_dummy_appointment):
             dispute_txid = get_random_value_hex(32)
             breaches[dummy_appointment.locator] = dispute_txid
 
-    watcher.locator_uuid_map = locator_uuid_map
-    watcher.appointments = appointments
+    watcher.db_manager.batch_store_watcher_appointments(db_appointments)
+    watcher.locator_uuid_map.clear()
+    watcher.locator_uuid_map.update(locator_uuid_map)
+    watcher.appointments.clear()
+    watcher.appointments.update(appointments)
 
     valid_breaches, invalid_breaches = watcher.filter_breaches(breaches)
 